@@ -1,18 +1,124 @@
-from typing import List, Dict, Any
-import requests
+import json
+import threading
+from concurrent.futures import Future
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
 from models import Hero, LandZ, Building, BuffMission
-from config import API_BASE_URL, DISPATCH_ENDPOINT, CLAIM_ENDPOINT, PRIMAL_TAG, PRIMAL_SUFFIX
+from config import (
+    API_BASE_URL, DISPATCH_ENDPOINT, CLAIM_ENDPOINT, PRIMAL_TAG, PRIMAL_SUFFIX,
+    HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_TIMEOUT_DEFAULT, HTTP_TIMEOUTS, HTTP_READ_RETRIES,
+)
+from limiter import AdaptiveLimiter, OK, ERROR, THROTTLED
+
+if TYPE_CHECKING:
+    import requests
+
+def _json(response: "requests.Response", body: Any) -> Any:
+    """Body already parsed by Api._request; a non-JSON 200 raises like response.json()."""
+    return response.json() if body is None else body
+
 
 class Api:
-    def __init__(self, token: str, region: int = 1):
+    def __init__(
+        self,
+        token: str,
+        region: int = 1,
+        limiter: Optional[AdaptiveLimiter] = None,
+        pool_connections: int = HTTP_POOL_CONNECTIONS,
+        pool_maxsize: int = HTTP_POOL_MAXSIZE,
+        timeouts: Optional[Dict[str, Tuple[float, float]]] = None,
+    ):
+        # Every request goes through the adaptive limiter (shared across threads)
+        self.limiter = limiter or AdaptiveLimiter()
+        self.timeouts = dict(HTTP_TIMEOUTS, **(timeouts or {}))
+        # requests is imported here, not at module level, so `import api` stays cheap
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self._request_error = requests.RequestException
         # Create a session with default headers for all requests
         self.session = requests.Session()
+        # Keep-alive pool sized for parallel callers; retries are handled by the limiter/dispatcher
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update({
             "Authorization": f"Bearer {token}",
             "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
             "Content-Type": "application/json",
             "X-Region-Id": str(region),  # 1 = Meta Toy City, 2 = Ludo City
         })
+        # Identical reads in flight: key -> Future[Response]
+        self._in_flight: Dict[str, Future] = {}
+        self._in_flight_lock = threading.Lock()
+
+    def _timeout_for(self, url: str) -> Tuple[float, float]:
+        for endpoint, timeout in self.timeouts.items():
+            if url.endswith(endpoint):
+                return timeout
+        return HTTP_TIMEOUT_DEFAULT
+
+    def _read(self, method: str, url: str, **kwargs) -> Tuple["requests.Response", Any]:
+        """Idempotent read: concurrent identical calls share one in-flight request.
+        Throttled (429/5xx) or failed attempts are retried up to HTTP_READ_RETRIES times;
+        the limiter's jittered cooldown spaces the retries out."""
+        key = f"{method} {url} {json.dumps(kwargs.get('json'), sort_keys=True)}"
+        with self._in_flight_lock:
+            shared = self._in_flight.get(key)
+            owner = shared is None
+            if owner:
+                shared = self._in_flight[key] = Future()
+        if not owner:
+            return shared.result()
+        try:
+            result = self._read_with_retries(method, url, **kwargs)
+            shared.set_result(result)
+            return result
+        except BaseException as exc:
+            shared.set_exception(exc)
+            raise
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.pop(key, None)
+
+    def _read_with_retries(self, method: str, url: str, **kwargs) -> Tuple["requests.Response", Any]:
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response, body = self._request(method, url, **kwargs)
+            except self._request_error as exc:
+                if attempt > HTTP_READ_RETRIES:
+                    raise
+                print(f"[API] ⚠️ Read failed ({exc}); retry {attempt}/{HTTP_READ_RETRIES}")
+                continue
+            throttled = response.status_code == 429 or response.status_code >= 500
+            if not throttled or attempt > HTTP_READ_RETRIES:
+                return response, body
+            print(f"[API] ⚠️ Read throttled (HTTP {response.status_code}); retry {attempt}/{HTTP_READ_RETRIES}")
+
+    def _request(self, method: str, url: str, **kwargs) -> Tuple["requests.Response", Any]:
+        """Send a request inside a limiter slot and feed the outcome back to it.
+        Returns the response and its JSON body (None if not JSON), parsed once here."""
+        kwargs.setdefault("timeout", self._timeout_for(url))
+        with self.limiter.slot() as result:
+            response = self.session.request(method, url, **kwargs)
+            try:
+                body = response.json()
+            except ValueError:
+                body = None
+            if response.status_code == 429 or response.status_code >= 500:
+                result["outcome"] = THROTTLED
+            elif response.status_code != 200:
+                result["outcome"] = ERROR
+            else:
+                try:
+                    status = body.get("header", {}).get("status", 200)
+                except AttributeError:
+                    status = 200
+                result["outcome"] = OK if int(status or 200) == 200 else ERROR
+        return response, body
 
     def get_heroes(self) -> List[Hero]:
         """Fetch the list of available heroes for dispatch.
@@ -28,10 +134,10 @@ class Api:
             "starStart": 0,
             "starEnd": 3,
         }
-        response = self.session.post(url, json=payload)
+        response, data = self._read("POST", url, json=payload)
         response.raise_for_status()
 
-        body = response.json().get("body", [])
+        body = _json(response, data).get("body", [])
         if not isinstance(body, list):
             print("[WARN] dispatchHeroZList unexpected format; using empty list.")
             return []
@@ -60,9 +166,9 @@ class Api:
     def get_lands(self) -> List[LandZ]:
         """Fetch the list of lands and their token IDs."""
         url = f"{API_BASE_URL}/landz/dispatchList"
-        response = self.session.get(url)
+        response, data = self._read("GET", url)
         response.raise_for_status()
-        data = response.json().get("body", {})
+        data = _json(response, data).get("body", {})
         land_array = data.get("dispatchLandZList", data if isinstance(data, list) else [])
         lands: List[LandZ] = []
         for land_data in land_array:
@@ -72,9 +178,9 @@ class Api:
     def get_buildings(self, land_token: int) -> List[Building]:
         """Fetch all buildings for a given land."""
         url = f"{API_BASE_URL}/landz/dispatchBuildingInfo"
-        response = self.session.post(url, json={"tokenId": str(land_token)})
+        response, data = self._read("POST", url, json={"tokenId": str(land_token)})
         response.raise_for_status()
-        building_array = response.json().get("body", [])
+        building_array = _json(response, data).get("body", [])
         buildings: List[Building] = []
         for building_data in building_array:
             # Parse buff missions for each building
@@ -125,17 +231,19 @@ class Api:
         """Send a dispatch request with the chosen heroes."""
         hero_str = ",".join(f"{hero.tokenId}-{PRIMAL_TAG}-{PRIMAL_SUFFIX}" for hero in heroes)
         payload = {"heroZTokenIds": hero_str, "landZTokenId": str(land_id), "buildingType": building_type}
-        response = self.session.post(f"{API_BASE_URL}{DISPATCH_ENDPOINT}", json=payload)
-        try:
-            return response.json()
-        except Exception:
+        response, body = self._request("POST", f"{API_BASE_URL}{DISPATCH_ENDPOINT}", json=payload)
+        if body is None:
             return {"raw": response.text, "status_code": response.status_code}
+        return body
 
     def claim(self, land_id: int) -> Dict[str, Any]:
         """Claim rewards for a specific land."""
         payload = {"tokenId": str(land_id)}
-        response = self.session.post(f"{API_BASE_URL}{CLAIM_ENDPOINT}", json=payload)
         try:
-            return response.json()
-        except Exception:
-            return {"raw": response.text, "status_code": response.status_code}
\ No newline at end of file
+            response, body = self._request("POST", f"{API_BASE_URL}{CLAIM_ENDPOINT}", json=payload)
+        except self._request_error as exc:
+            # Timeouts/connection errors become a failed status; claiming again later is harmless
+            return {"header": {"status": 0, "message": f"request error: {exc}"}}
+        if body is None:
+            return {"raw": response.text, "status_code": response.status_code}
+        return body
\ No newline at end of file
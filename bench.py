@@ -0,0 +1,213 @@
+"""Planner benchmark and solution-quality regression harness.
+
+Runs fixed-seed synthetic scenarios through selector.evaluate_mission_with_available
+and planner.build_plan, records wall time, peak memory, backtracking nodes and
+total estimated points, and compares them with bench_baseline.json.
+
+Only the deterministic metrics (points, nodes) can fail the run; time and memory
+depend on the machine and are reported as ratios to the baseline for information.
+
+    python bench.py                    # compare against the baseline (exit 1 on regression)
+    python bench.py --update-baseline  # record a new baseline
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+
+from models import Hero, BuffMission, Building, LandZ
+from planner import build_plan
+from selector import evaluate_mission_with_available, SEARCH_STATS
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+# name -> (seed, heroes, lands, buildings per land, missions profile)
+SCENARIOS: Dict[str, Tuple[int, int, int, int, str]] = {
+    "small": (1, 24, 2, 3, "mixed"),
+    "typical": (2, 120, 8, 5, "mixed"),
+    "whale": (3, 400, 25, 5, "mixed"),
+    "adversarial": (4, 160, 10, 5, "adversarial"),
+}
+
+
+def _random_hero(rng: random.Random, token_id: int, profile: str) -> Hero:
+    if profile == "adversarial":
+        # Near-identical cheap heroes: many ties, every broad mission matches many of them
+        grade = rng.choice([0, 0, 0, 1, 2])
+        race = rng.choice([0, 1])
+        star = rng.choice([0, 1])
+    else:
+        grade = rng.choice([0, 0, 0, 0, 1, 1, 1, 2, 2, 3, 4])
+        race = rng.randrange(11)
+        star = rng.randrange(4)
+    primal = rng.choice([1, 1, 2])
+    return Hero(tokenId=token_id, grade=grade, name=f"H{token_id}", race=race, star=star, primalType=primal, createType=primal)
+
+
+def _random_mission(rng: random.Random, profile: str) -> BuffMission:
+    if profile == "adversarial":
+        # Broad conditions with high counts: lots of partial matches for the backtracking
+        return BuffMission(
+            title="adv", createType=-1,
+            herozGrade=rng.choice([-1, 0]), herozGradeType=1,
+            herozRace=rng.choice([-1, 0, 1]), herozRaceType=0,
+            herozStar=rng.choice([-1, 1]), herozStarType=1,
+            boostConditionCount=3, buffAmount=rng.choice([10, 20]),
+        )
+    return BuffMission(
+        title="mix", createType=rng.choice([-1, 1, 2]),
+        herozGrade=rng.choice([-1, 0, 1, 2]), herozGradeType=rng.choice([0, 1]),
+        herozRace=rng.choice([-1, rng.randrange(11)]), herozRaceType=0,
+        herozStar=rng.choice([-1, 1, 2]), herozStarType=rng.choice([0, 1]),
+        boostConditionCount=rng.choice([1, 2, 2, 3]), buffAmount=rng.choice([10, 20, 30]),
+    )
+
+
+def make_scenario(name: str) -> Tuple[List[Hero], List[LandZ]]:
+    seed, hero_count, land_count, per_land, profile = SCENARIOS[name]
+    rng = random.Random(seed)
+    heroes = [_random_hero(rng, token_id, profile) for token_id in range(1, hero_count + 1)]
+    lands: List[LandZ] = []
+    for index in range(land_count):
+        buildings = []
+        for building_type in range(1, per_land + 1):
+            grade = rng.choice([0, 1, 1, 2, 2, 3]) if profile == "adversarial" else rng.choice([0, 0, 1, 1, 2, 2, 3, 4])
+            buildings.append(Building(
+                buildingType=building_type, grade=grade, name=f"B{building_type}",
+                herozList=[], pendingReward=False,
+                buffMissions=[_random_mission(rng, profile) for _ in range(2)],
+                remainCount=0, rewardAmount=0,
+            ))
+        lands.append(LandZ(tokenId=10000 + index, name=f"Land{index}", buildings=buildings))
+    return heroes, lands
+
+
+def _timed(fn, repeat: int):
+    """Best-of-`repeat` wall time (least noisy) and the result of the last run."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        SEARCH_STATS["nodes"] = 0
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def _evaluate_all(heroes: List[Hero], lands: List[LandZ]) -> float:
+    points = 0.0
+    for land in lands:
+        for building in land.buildings:
+            points += evaluate_mission_with_available(heroes, building, land.tokenId, land.name).estimated_total_points
+    return points
+
+
+def run_scenario(name: str, repeat: int = 3) -> Dict[str, float]:
+    heroes, lands = make_scenario(name)
+    elapsed, plan = _timed(lambda: build_plan(None, lands, heroes), repeat)
+    plan_nodes = SEARCH_STATS["nodes"]
+
+    # Second run only for peak memory (tracemalloc distorts timings)
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        build_plan(None, lands, heroes)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Selector alone: every building against the full pool (no consumption)
+    selector_elapsed, selector_points = _timed(lambda: _evaluate_all(heroes, lands), repeat)
+
+    return {
+        "plan_seconds": round(elapsed, 4),
+        "plan_peak_kib": round(peak / 1024, 1),
+        "plan_nodes": plan_nodes,
+        "plan_points": round(sum(c.estimated_total_points for c in plan.choices if c.chosen_heroes), 2),
+        "selector_seconds": round(selector_elapsed, 4),
+        "selector_nodes": SEARCH_STATS["nodes"],
+        "selector_points": round(selector_points, 2),
+    }
+
+
+def compare(name: str, current: Dict[str, float], baseline: Dict[str, float], node_tolerance: float) -> List[str]:
+    """Regressions of `current` vs `baseline`. Points must never drop; nodes may grow
+    by `node_tolerance` (ratio). Both are deterministic for a fixed seed."""
+    problems: List[str] = []
+    for key in ("plan_points", "selector_points"):
+        if current[key] < baseline[key]:
+            problems.append(f"{name}: {key} dropped {baseline[key]} → {current[key]}")
+    for key in ("plan_nodes", "selector_nodes"):
+        if current[key] > baseline[key] * (1 + node_tolerance):
+            problems.append(f"{name}: {key} grew {baseline[key]} → {current[key]}")
+    return problems
+
+
+def report(name: str, current: Dict[str, float], baseline: Dict[str, float]):
+    """Time and memory relative to the baseline. Not gated: only meaningful when the
+    baseline was recorded on this machine."""
+    ratios = []
+    for key in ("plan_seconds", "selector_seconds", "plan_peak_kib"):
+        if baseline.get(key):
+            ratios.append(f"{key}=x{current[key] / baseline[key]:.2f}")
+    print(f"[BENCH] {name:<12} vs baseline: {' '.join(ratios)} (informational)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Planner benchmark / regression harness")
+    parser.add_argument("--update-baseline", action="store_true", help="Store current results as the new baseline")
+    parser.add_argument("--node-tolerance", type=float, default=0.0, help="Allowed relative growth of search nodes before failing")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Run only these scenarios")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the fastest one is kept")
+    args = parser.parse_args()
+
+    names = args.scenario or list(SCENARIOS)
+    results = {}
+    for name in names:
+        results[name] = run_scenario(name, args.repeat)
+        r = results[name]
+        print(
+            f"[BENCH] {name:<12} plan={r['plan_seconds']:.3f}s peak={r['plan_peak_kib']:.0f}KiB "
+            f"nodes={r['plan_nodes']} points={r['plan_points']:.1f} | "
+            f"selector={r['selector_seconds']:.3f}s nodes={r['selector_nodes']} points={r['selector_points']:.1f}"
+        )
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH, "r", encoding="utf-8") as fh:
+                baseline = json.load(fh)
+        baseline.update(results)
+        with open(BASELINE_PATH, "w", encoding="utf-8") as fh:
+            json.dump(baseline, fh, indent=2, sort_keys=True)
+            fh.write("\n")
+        print(f"[BENCH] Baseline written to {BASELINE_PATH}")
+        return
+
+    if not os.path.exists(BASELINE_PATH):
+        print("[BENCH] No baseline found; run with --update-baseline first.")
+        sys.exit(1)
+    with open(BASELINE_PATH, "r", encoding="utf-8") as fh:
+        baseline = json.load(fh)
+
+    problems: List[str] = []
+    for name in names:
+        if name in baseline:
+            report(name, results[name], baseline[name])
+            problems.extend(compare(name, results[name], baseline[name], args.node_tolerance))
+        else:
+            print(f"[BENCH] ⚠️ No baseline for scenario {name}")
+    if problems:
+        for problem in problems:
+            print(f"[BENCH] ❌ {problem}")
+        sys.exit(1)
+    print("[BENCH] ✅ No regressions.")
+
+
+if __name__ == "__main__":
+    main()
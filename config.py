@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Tuple
 
 # Mapping of grade values to human-readable names
 GRADE_MAP: Dict[int, str] = {0: "Common", 1: "Rare", 2: "Epic", 3: "Legendary", 4: "Mythical"}
@@ -15,9 +15,38 @@ BUILDING_HERO_COUNT: int = 4
 # Priority order of missions by grade (kept for future heuristics)
 MISSION_PRIORITY = [4, 3, 2, 1, 0]
 
+# Dispatch duration per building grade, in hours (horizon planner model)
+DISPATCH_HOURS: Dict[int, float] = {0: 24.0, 1: 24.0, 2: 24.0, 3: 24.0, 4: 24.0}
+
+# The server gives no end time for busy buildings; assume this fraction of a dispatch is still left
+BUSY_REMAINING_FRACTION: float = 0.5
+
 # API Endpoints / Params
 API_BASE_URL = "https://dapp-backend.pixelheroes.io"
 DISPATCH_ENDPOINT = "/landz/dispatchHeroZReg"
 CLAIM_ENDPOINT = "/landz/dispatchReward"
 PRIMAL_TAG = "PRIMAL"
-PRIMAL_SUFFIX = "0"
\ No newline at end of file
+PRIMAL_SUFFIX = "0"
+
+# HTTP transport (connection pool, timeouts)
+HTTP_POOL_CONNECTIONS: int = 4  # distinct hosts kept in the pool
+HTTP_POOL_MAXSIZE: int = 32  # keep-alive connections per host; >= LIMITER_MAX
+HTTP_TIMEOUT_DEFAULT: Tuple[float, float] = (5.0, 20.0)  # (connect, read) seconds
+HTTP_TIMEOUTS: Dict[str, Tuple[float, float]] = {
+    "/landz/dispatchHeroZList": (5.0, 30.0),  # biggest payload
+    DISPATCH_ENDPOINT: (5.0, 30.0),
+    CLAIM_ENDPOINT: (5.0, 30.0),
+}
+HTTP_READ_RETRIES: int = 3  # extra attempts for throttled (429/5xx) or failed reads, after the limiter's cooldown
+
+# --resume ignores journal entries older than this (hours)
+JOURNAL_RESUME_MAX_HOURS: float = 6.0
+
+# Adaptive concurrency (AIMD) for all API calls
+LIMITER_INITIAL: int = 2  # concurrent requests allowed at start
+LIMITER_MIN: int = 1
+LIMITER_MAX: int = 16
+LIMITER_LATENCY_TARGET: float = 2.0  # seconds; slower responses count as congestion
+LIMITER_DECREASE_FACTOR: float = 0.5  # multiplicative decrease on errors/throttling
+LIMITER_BACKOFF_BASE: float = 1.0  # seconds; doubled per consecutive throttle, with jitter
+LIMITER_BACKOFF_MAX: float = 30.0
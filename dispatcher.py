@@ -1,9 +1,10 @@
 import time
 import json
-from typing import Tuple
+from typing import Tuple, Optional
 from models import DispatchChoice
 from api import Api
 from config import PRIMAL_TAG, PRIMAL_SUFFIX
+from journal import DispatchJournal, IN_FLIGHT, SUCCEEDED, FAILED
 
 ALREADY_MSG_KEYS = (
     "already being dispatched",
@@ -11,6 +12,11 @@ ALREADY_MSG_KEYS = (
     "already in progress",
 )
 
+# Outcomes of dispatch_choice
+OUTCOME_SENT = "sent"
+OUTCOME_SKIPPED = "skipped"  # building busy on server; the chosen heroes were not used
+OUTCOME_FAILED = "failed"
+
 
 def _payload(choice: DispatchChoice) -> dict:
     hero_list = [f"{h.tokenId}-{PRIMAL_TAG}-{PRIMAL_SUFFIX}" for h in choice.chosen_heroes]
@@ -34,44 +40,139 @@ def _server_in_progress(api: Api, land_id: int, building_type: int) -> Tuple[boo
     return False, 0, False
 
 
-def run_dispatch_single(api: Api, choice: DispatchChoice, max_retries: int = 3, delay: int = 5) -> bool:
-    """Dispatch a single building choice with exponential backoff retries."""
-    in_progress, count, pending = _server_in_progress(api, choice.landId, choice.buildingType)
-    if in_progress or pending:
-        reason = "pendingReward=true" if pending else f"herozList has {count} hero(s)"
-        print(f"[SKIP] Building already busy on server → land={choice.landId} btype={choice.buildingType} ({reason})")
-        return True
+def _landed_after_error(api: Api, choice: DispatchChoice) -> Optional[str]:
+    """After a request error the dispatch may or may not have reached the server.
+    Returns OUTCOME_SENT if the building now holds our heroes, OUTCOME_SKIPPED if it
+    is busy with others, None if it is idle (safe to send again) or unknown."""
+    try:
+        buildings = api.get_buildings(choice.landId)
+    except Exception as exc:
+        print(f"[API] ⚠️ State check after error failed: {exc}")
+        return None
+    ours = {int(h.tokenId) for h in choice.chosen_heroes}
+    for building in buildings:
+        if int(building.buildingType) != int(choice.buildingType):
+            continue
+        if ours and ours <= {int(h.tokenId) for h in building.herozList}:
+            return OUTCOME_SENT
+        if building.herozList or building.pendingReward:
+            return OUTCOME_SKIPPED
+    return None
+
+
+def run_dispatch_single(
+    api: Api,
+    choice: DispatchChoice,
+    max_retries: int = 3,
+    delay: int = 5,
+    journal: Optional[DispatchJournal] = None,
+) -> bool:
+    """Dispatch a single building choice with exponential backoff retries.
+    When a journal is given, every state transition is appended to it."""
+    return dispatch_choice(api, choice, max_retries, delay, journal) != OUTCOME_FAILED
+
+
+def dispatch_choice(
+    api: Api,
+    choice: DispatchChoice,
+    max_retries: int = 3,
+    delay: int = 5,
+    journal: Optional[DispatchJournal] = None,
+    preflight: bool = True,
+) -> str:
+    """Same as run_dispatch_single, but tells a real dispatch apart from a skip.
+    `preflight=False` skips the busy-building check (caller knows it was never sent).
+    Timeouts and connection errors are retried like error statuses; before resending,
+    the building is checked in case the lost request went through. If retries run out
+    the journal entry is left IN_FLIGHT so a resume re-checks it."""
+    if preflight:
+        in_progress, count, pending = _server_in_progress(api, choice.landId, choice.buildingType)
+        if in_progress or pending:
+            reason = "pendingReward=true" if pending else f"herozList has {count} hero(s)"
+            print(f"[SKIP] Building already busy on server → land={choice.landId} btype={choice.buildingType} ({reason})")
+            if journal is not None:
+                journal.record(choice, SUCCEEDED, f"busy on server ({reason})")
+            return OUTCOME_SKIPPED
+
+    from requests import RequestException  # requests is already loaded by Api
 
     attempts = 0
+    uncertain = False  # last attempt raised: the server may have applied it
     while attempts < max_retries:
         attempts += 1
+        if uncertain:
+            landed = _landed_after_error(api, choice)
+            if landed is not None:
+                print(f"[API] Previous attempt reached the server → {landed}")
+                if journal is not None:
+                    journal.record(choice, SUCCEEDED, "confirmed after request error")
+                return landed
         payload = _payload(choice)
         print(f"[API] Dispatching… payload={json.dumps(payload)}")
 
-        response = api.dispatch(choice.landId, choice.buildingType, choice.chosen_heroes)
+        if journal is not None:
+            journal.record(choice, IN_FLIGHT)
+        try:
+            response = api.dispatch(choice.landId, choice.buildingType, choice.chosen_heroes)
+        except RequestException as exc:
+            # Timeout or connection error: outcome unknown, the journal entry stays IN_FLIGHT
+            uncertain = True
+            print(f"[API] ❌ Request error → {exc} | attempt {attempts}/{max_retries}")
+            if attempts >= max_retries:
+                print("[API] ❌ Giving up after retries (dispatch left uncertain in journal).")
+                return OUTCOME_FAILED
+            wait_time = delay * (2 ** (attempts - 1))
+            print(f"[API] Retrying in {wait_time}s…")
+            time.sleep(wait_time)
+            continue
+        uncertain = False
         status = response.get("header", {}).get("status", 0)
         message = (response.get("header", {}).get("message") or "").strip()
         print(f"[API] Response status={status}, message={message}")
 
         if status == 200:
             print("[API] ✅ SUCCESS")
-            return True
+            if journal is not None:
+                journal.record(choice, SUCCEEDED)
+            return OUTCOME_SENT
 
         if status == 201:
             lower = message.lower()
             if any(key in lower for key in ALREADY_MSG_KEYS):
                 print("[API] ⚠️ Already in progress at server. Skipping as success.")
-                return True
+                if journal is not None:
+                    journal.record(choice, SUCCEEDED, message)
+                return OUTCOME_SKIPPED
             else:
                 print(f"[API] ❌ Error (201) → {message} | attempt {attempts}/{max_retries}")
         else:
             print(f"[API] ❌ Error (status {status}) → {message} | attempt {attempts}/{max_retries}")
 
+        if journal is not None:
+            journal.record(choice, FAILED, f"status {status}: {message}")
         if attempts >= max_retries:
             print("[API] ❌ Giving up after retries.")
-            return False
+            return OUTCOME_FAILED
         wait_time = delay * (2 ** (attempts - 1))
         print(f"[API] Retrying in {wait_time}s…")
         time.sleep(wait_time)
 
-    return False
\ No newline at end of file
+    return OUTCOME_FAILED
+
+def resume_from_journal(api: Api, journal: DispatchJournal, max_retries: int = 3, delay: int = 5) -> int:
+    """Replay what an interrupted run left unfinished, without refetching the world.
+
+    PLANNED entries were never sent and go out directly; IN_FLIGHT ones are uncertain,
+    so only their land is checked (preflight) before re-sending. Returns dispatches sent.
+    """
+    pending = journal.unfinished()
+    if not pending:
+        print("[RESUME] Nothing to resume.")
+        return 0
+    print(f"[RESUME] {len(pending)} unfinished dispatch(es) in journal")
+    sent = 0
+    for choice, state in pending:
+        outcome = dispatch_choice(api, choice, max_retries, delay, journal, preflight=(state == IN_FLIGHT))
+        if outcome == OUTCOME_SENT:
+            sent += 1
+    return sent
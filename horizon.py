@@ -0,0 +1,187 @@
+import heapq
+from dataclasses import dataclass, replace
+from typing import Dict, List, Set, Tuple
+
+from models import LandZ, Building, Hero, Plan, DispatchChoice
+from config import DISPATCH_HOURS, BUSY_REMAINING_FRACTION, GRADE_POINTS, BUILDING_HERO_COUNT
+from planner import HELD_REASON, _collect_candidates, _plan_candidates
+from selector import _hero_cost_key
+
+BuildingKey = Tuple[int, int]  # (landId, buildingType)
+
+
+def _duration(grade: int) -> float:
+    return DISPATCH_HOURS.get(grade, max(DISPATCH_HOURS.values()))
+
+
+@dataclass
+class _Slot:
+    """A building inside the simulation."""
+    land: LandZ
+    building: Building
+    free_at: float
+    remaining: int  # dispatches left (remainCount); 0 = exhausted
+
+
+def _initial_state(lands: List[LandZ], hero_pool: List[Hero]) -> Tuple[Dict[BuildingKey, _Slot], Dict[int, Tuple[float, Hero]]]:
+    """Event model at t=0: idle buildings are free now; busy ones (and the heroes
+    sitting in them) free up after the assumed remaining part of their dispatch."""
+    slots: Dict[BuildingKey, _Slot] = {}
+    heroes: Dict[int, Tuple[float, Hero]] = {h.tokenId: (0.0, h) for h in hero_pool}
+    for land in lands:
+        for building in land.buildings:
+            free_at = 0.0
+            if building.herozList and not building.pendingReward:
+                free_at = _duration(building.grade) * BUSY_REMAINING_FRACTION
+            for hero in building.herozList:
+                heroes.setdefault(hero.tokenId, (free_at, hero))
+            slots[(land.tokenId, building.buildingType)] = _Slot(land, building, free_at, max(0, building.remainCount))
+    return slots, heroes
+
+
+def _simulate(
+    slots: Dict[BuildingKey, _Slot],
+    heroes: Dict[int, Tuple[float, Hero]],
+    first_round: List[DispatchChoice],
+    horizon: float,
+) -> float:
+    """Total points of dispatches completed within `horizon` hours, when `first_round`
+    goes out now. Later events use a cheap estimate instead of the full selector:
+    buildings in grade order take their cheapest key plus the cheapest fillers and
+    score base points. Buffs are ignored there; the question the simulation answers
+    is whether a key is free when a building is, and that is what decides points
+    across cycles."""
+    slots = {k: replace(v) for k, v in slots.items()}
+    heroes = dict(heroes)
+    points = 0.0
+    events: List[float] = []
+
+    def start(t: float, choice: DispatchChoice):
+        nonlocal points
+        slot = slots[(choice.landId, choice.buildingType)]
+        end = t + _duration(choice.grade)
+        slot.free_at = end
+        slot.remaining = max(0, slot.remaining - 1)
+        for hero in choice.chosen_heroes:
+            heroes[hero.tokenId] = (end, hero)
+        if end <= horizon:
+            points += choice.estimated_total_points
+        heapq.heappush(events, end)
+
+    for choice in first_round:
+        start(0.0, choice)
+    for free_at, _ in heroes.values():
+        if free_at > 0:
+            heapq.heappush(events, free_at)
+    for slot in slots.values():
+        if slot.free_at > 0:
+            heapq.heappush(events, slot.free_at)
+
+    last = 0.0
+    while events:
+        t = heapq.heappop(events)
+        if t <= last:
+            continue
+        if t >= horizon:
+            break
+        last = t
+        pool = sorted((hero for free_at, hero in heroes.values() if free_at <= t), key=_hero_cost_key)
+        ready = [s for s in slots.values() if s.free_at <= t and s.remaining > 0]
+        ready.sort(key=lambda s: (s.building.grade, s.building.name), reverse=True)
+        for slot in ready:
+            grade = slot.building.grade
+            key_index = next((i for i, hero in enumerate(pool) if hero.grade >= grade), None)
+            if key_index is None:
+                continue
+            key_hero = pool.pop(key_index)
+            team = [key_hero] + pool[:BUILDING_HERO_COUNT - 1]
+            del pool[:BUILDING_HERO_COUNT - 1]
+            start(t, _estimated_choice(slot, team))
+    return points
+
+
+def _estimated_choice(slot: _Slot, team: List[Hero]) -> DispatchChoice:
+    base_points = GRADE_POINTS.get(slot.building.grade, 0)
+    return DispatchChoice(
+        landId=slot.land.tokenId,
+        landName=slot.land.name,
+        buildingType=slot.building.buildingType,
+        buildingName=slot.building.name,
+        grade=slot.building.grade,
+        base_points=base_points,
+        buffs_possible=0,
+        buff_percent_each=0.0,
+        estimated_total_points=base_points,
+        chosen_heroes=team,
+        satisfied_buffs_titles=[],
+        reserved_heroes=[],
+        reason="Simulated.",
+    )
+
+
+def _overqualified(choice: DispatchChoice) -> bool:
+    """Uses a hero whose grade could key a higher-grade building."""
+    return any(hero.grade > choice.grade for hero in choice.chosen_heroes)
+
+
+def build_horizon_plan(
+    api,
+    lands: List[LandZ],
+    hero_pool: List[Hero],
+    cycles: int = 3,
+    max_variants: int = 8,
+) -> Plan:
+    """Like build_plan, but may hold back low-grade dispatches whose heroes are worth
+    more in a later cycle.
+
+    Simulates `cycles` dispatch cycles with an event queue of building/hero
+    availability and greedily (hill climbing, at most `max_variants` simulations)
+    holds back first-round choices that use over-qualified heroes when that raises
+    points per day. A building is dispatched at most remainCount more times after
+    the first round. Only the first round runs the full selector (one build_plan
+    pass); a variant is that round minus the held choices, whose heroes simply
+    stay free, so trying a variant costs one cheap simulation.
+    """
+    horizon = cycles * max(DISPATCH_HOURS.values())
+    days = horizon / 24.0
+    candidates = _collect_candidates(lands)
+    slots, heroes = _initial_state(lands, hero_pool)
+    greedy, _ = _plan_candidates(candidates, hero_pool)
+    dispatchable = [c for c in greedy.choices if c.chosen_heroes]
+
+    def score(held: Set[BuildingKey]) -> float:
+        kept = [c for c in dispatchable if (c.landId, c.buildingType) not in held]
+        return _simulate(slots, heroes, kept, horizon) / days
+
+    held: Set[BuildingKey] = set()
+    best_score = greedy_score = score(held)
+
+    # Lowest grade first: those are the cheapest dispatches to postpone
+    to_try = sorted(
+        (c for c in dispatchable if _overqualified(c)),
+        key=lambda c: (c.grade, c.estimated_total_points),
+    )[:max_variants]
+    for choice in to_try:
+        trial_held = held | {(choice.landId, choice.buildingType)}
+        trial_score = score(trial_held)
+        if trial_score > best_score:
+            best_score, held = trial_score, trial_held
+
+    print(
+        f"[HORIZON] {cycles} cycle(s): greedy={greedy_score:.1f} pts/day, "
+        f"chosen={best_score:.1f} pts/day, held back={len(held)}"
+    )
+    if not held:
+        return greedy
+
+    choices = [
+        replace(
+            c,
+            chosen_heroes=[],
+            reserved_heroes=c.chosen_heroes,
+            reason=HELD_REASON,
+        ) if (c.landId, c.buildingType) in held else c
+        for c in greedy.choices
+    ]
+    # Held choices join the reservations, keeping build_plan's ordering
+    return Plan(choices=[c for c in choices if c.chosen_heroes] + [c for c in choices if not c.chosen_heroes])
@@ -0,0 +1,129 @@
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from models import DispatchChoice, Hero
+from config import JOURNAL_RESUME_MAX_HOURS
+
+# Dispatch states recorded in the journal
+PLANNED = "planned"
+IN_FLIGHT = "in_flight"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Marker written when a fresh (non-resume) run starts; replay forgets everything before it
+RESET = "reset"
+
+JournalKey = Tuple[int, int, Tuple[int, ...]]
+
+
+def journal_key(choice: DispatchChoice) -> JournalKey:
+    """(landId, buildingType, heroes) — heroes sorted so the key is order independent."""
+    return (
+        int(choice.landId),
+        int(choice.buildingType),
+        tuple(sorted(int(h.tokenId) for h in choice.chosen_heroes)),
+    )
+
+
+class DispatchJournal:
+    """Append-only JSON Lines journal of dispatch states.
+
+    Each line is one state transition; on replay the last state per key wins.
+    Lines are flushed and fsync'ed so a crash never loses a transition that
+    was reported as written. A resumed run appends to the same journal, so once
+    it finishes every entry is terminal and a second resume has nothing to do.
+    """
+
+    def __init__(self, path: str, resume: bool = False, max_age_hours: float = JOURNAL_RESUME_MAX_HOURS):
+        self.path = path
+        self.resume = resume
+        self.max_age_hours = max_age_hours
+        self._states: Dict[JournalKey, str] = {}
+        self._times: Dict[JournalKey, float] = {}
+        if resume:
+            self._load()
+        else:
+            self._append({"event": RESET})
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            print(f"[JOURNAL] No journal at {self.path}; nothing to resume.")
+            return
+        with open(self.path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A crash mid-write leaves a truncated last line; ignore it
+                    print(f"[JOURNAL] ⚠️ Ignoring corrupt line: {line[:80]}")
+                    continue
+                if record.get("event") == RESET:
+                    self._states.clear()
+                    self._times.clear()
+                    continue
+                key = (int(record["landId"]), int(record["buildingType"]), tuple(record.get("heroes", [])))
+                self._states[key] = record["event"]
+                self._times[key] = float(record.get("ts", 0))
+        print(f"[JOURNAL] Loaded {len(self._states)} entr(ies) from {self.path}")
+
+    def _append(self, record: dict):
+        record = {"ts": round(time.time(), 3), **record}
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def record(self, choice: DispatchChoice, event: str, message: str = ""):
+        key = journal_key(choice)
+        self._states[key] = event
+        self._times[key] = time.time()
+        record = {"event": event, "landId": key[0], "buildingType": key[1], "heroes": list(key[2])}
+        if message:
+            record["message"] = message
+        self._append(record)
+
+    def record_planned(self, choices: List[DispatchChoice]):
+        """Mark choices as about to be sent. Callers record a choice just before its
+        dispatch, never a whole plan up front: resume re-sends every PLANNED entry."""
+        for choice in choices:
+            if self.state(choice) is None:
+                self.record(choice, PLANNED)
+
+    def state(self, choice: DispatchChoice) -> Optional[str]:
+        """Last known state for this exact (land, building, heroes) dispatch."""
+        return self._states.get(journal_key(choice))
+
+    def unfinished(self) -> List[Tuple[DispatchChoice, str]]:
+        """Dispatches the interrupted run left PLANNED or IN_FLIGHT, rebuilt from the
+        journal alone (land, building type and hero ids are all the payload needs).
+        Entries older than `max_age_hours` are ignored: the world has moved on since."""
+        cutoff = time.time() - self.max_age_hours * 3600
+        pending: List[Tuple[DispatchChoice, str]] = []
+        for key, event in self._states.items():
+            if event not in (PLANNED, IN_FLIGHT):
+                continue
+            if self._times.get(key, 0) < cutoff:
+                print(f"[JOURNAL] Expired entry ignored → land={key[0]} btype={key[1]}")
+                continue
+            land_id, building_type, hero_ids = key
+            pending.append((DispatchChoice(
+                landId=land_id,
+                landName="",
+                buildingType=building_type,
+                buildingName="",
+                grade=-1,
+                base_points=0,
+                buffs_possible=0,
+                buff_percent_each=0.0,
+                estimated_total_points=0.0,
+                chosen_heroes=[Hero(tokenId=token_id, grade=-1) for token_id in hero_ids],
+                satisfied_buffs_titles=[],
+                reserved_heroes=[],
+                reason="Resumed from journal.",
+            ), event))
+        return pending
@@ -0,0 +1,98 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from config import (
+    LIMITER_INITIAL,
+    LIMITER_MIN,
+    LIMITER_MAX,
+    LIMITER_LATENCY_TARGET,
+    LIMITER_DECREASE_FACTOR,
+    LIMITER_BACKOFF_BASE,
+    LIMITER_BACKOFF_MAX,
+)
+
+# Outcomes reported back to the limiter after each request
+OK = "ok"
+ERROR = "error"  # API answered, but header.status != 200
+THROTTLED = "throttled"  # HTTP 429 / 5xx / network failure
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter shared by every API call.
+
+    - fast successful responses widen the window additively (~+1 per full window);
+    - slow responses and API errors narrow it multiplicatively;
+    - throttling (429/5xx) also narrows it and pauses new requests for a
+      jittered, exponentially growing cooldown.
+    Thread safe; serial callers simply never wait.
+    """
+
+    def __init__(
+        self,
+        initial: int = LIMITER_INITIAL,
+        minimum: int = LIMITER_MIN,
+        maximum: int = LIMITER_MAX,
+        latency_target: float = LIMITER_LATENCY_TARGET,
+        decrease_factor: float = LIMITER_DECREASE_FACTOR,
+        backoff_base: float = LIMITER_BACKOFF_BASE,
+        backoff_max: float = LIMITER_BACKOFF_MAX,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._limit = float(max(minimum, min(initial, maximum)))
+        self._in_flight = 0
+        self._throttle_streak = 0
+        self._cooldown_until = 0.0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                wait = self._cooldown_until - time.monotonic()
+                if wait <= 0 and self._in_flight < int(self._limit):
+                    self._in_flight += 1
+                    return
+                # Either cooling down after throttling or the window is full
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self, latency: float, outcome: str):
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            if outcome == THROTTLED:
+                self._throttle_streak += 1
+                self._decrease()
+                backoff = min(self.backoff_max, self.backoff_base * (2 ** (self._throttle_streak - 1)))
+                # Full jitter so parallel callers do not retry in lockstep
+                self._cooldown_until = max(self._cooldown_until, time.monotonic() + random.uniform(0, backoff))
+                print(f"[LIMIT] Throttled → concurrency={self.limit}, cooling down ≤{backoff:.1f}s")
+            elif outcome == ERROR or latency > self.latency_target:
+                self._throttle_streak = 0
+                self._decrease()
+            else:
+                self._throttle_streak = 0
+                self._limit = min(float(self.maximum), self._limit + 1.0 / self._limit)
+            self._cond.notify_all()
+
+    def _decrease(self):
+        self._limit = max(float(self.minimum), self._limit * self.decrease_factor)
+
+    @contextmanager
+    def slot(self):
+        """Hold one concurrency slot; the caller reports the outcome via the yielded dict."""
+        self.acquire()
+        started = time.monotonic()
+        result = {"outcome": THROTTLED}  # an exception escaping the block counts as throttling
+        try:
+            yield result
+        finally:
+            self.release(time.monotonic() - started, result["outcome"])
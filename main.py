@@ -1,8 +1,9 @@
 import argparse
 from api import Api
-from planner import build_plan
+from planner import build_plan, repair_plan
 from logger import log_plan
-from dispatcher import run_dispatch_single
+from dispatcher import dispatch_choice, resume_from_journal, OUTCOME_SENT, OUTCOME_FAILED
+from journal import DispatchJournal
 
 def _refresh_state(api: Api):
     heroes = api.get_heroes()
@@ -18,14 +19,35 @@ def main():
     parser.add_argument("--region", type=int, default=1, help="Region ID: 1=Meta Toy City, 2=Ludo City")
     parser.add_argument("--confirm", action="store_true", help="Execute dispatches (default is dry-run)")
     parser.add_argument("--all", action="store_true", help="In confirm mode, dispatch ALL available missions")
-    parser.add_argument("--max-dispatches", type=int, default=999999, help="Upper bound for total dispatches")
+    parser.add_argument("--max-dispatches", type=int, default=None, help="Upper bound for total dispatches (default: no bound)")
     parser.add_argument("--claim-first", action="store_true", help="Claim rewards before planning/dispatching")
+    parser.add_argument("--horizon-cycles", type=int, default=0, help="Plan over N future dispatch cycles (0 = current round only)")
+    parser.add_argument("--journal", type=str, default="dispatch_journal.jsonl", help="Append-only dispatch journal path")
+    parser.add_argument("--resume", action="store_true", help="Only replay what an interrupted --confirm run left unfinished in the journal (no full fetch)")
+    parser.add_argument("--stream", action="store_true", help="Plan and dispatch each land as soon as its buildings are fetched")
+    parser.add_argument("--what-if", type=str, default=None, help="JSON file of hypothetical hires to rank by points gained per cost (no dispatch)")
+    parser.add_argument("--workers", type=int, default=1, help="Processes used to evaluate --what-if scenarios in parallel")
     args = parser.parse_args()
+    if args.stream and args.horizon_cycles > 0:
+        parser.error("--stream plans the current round only; it cannot be combined with --horizon-cycles")
+    if args.workers > 1 and not args.what_if:
+        print("[WARN] --workers only applies to --what-if; ignoring it.")
 
     api = Api(args.token, region=args.region)
 
+    if args.resume:
+        # Recovery touches only the journal's unfinished entries: no full state sweep
+        journal = DispatchJournal(args.journal, resume=True)
+        total_sent = resume_from_journal(api, journal, max_retries=3, delay=5)
+        print(f"[RESUME] Finished. Total successful dispatches: {total_sent}")
+        return
+
     print("[ROUND 1] Fetching current state…")
-    heroes, lands = _refresh_state(api)
+    if args.stream and not args.claim_first and not args.what_if:
+        # Buildings are fetched by the pipeline itself
+        heroes, lands = api.get_heroes(), api.get_lands()
+    else:
+        heroes, lands = _refresh_state(api)
 
     if args.claim_first:
         for land in lands:
@@ -40,9 +62,33 @@ def main():
                 else:
                     print(f"[CLAIM] ❌ FAILED (status {status}) → {msg}")
         # refresh state after claims
-        heroes, lands = _refresh_state(api)
+        heroes, lands = (api.get_heroes(), api.get_lands()) if args.stream and not args.what_if else _refresh_state(api)
+
+    # Optional features are imported only when their flag is used (faster startup)
+    if args.what_if:
+        from whatif import rank_hires, load_candidates, log_hires
+
+        log_hires(rank_hires(lands, heroes, load_candidates(args.what_if), workers=args.workers))
+        return
 
-    plan = build_plan(api, lands, heroes)
+    if args.stream:
+        from pipeline import run_pipeline
+
+        journal = DispatchJournal(args.journal) if args.confirm else None
+        limit = args.max_dispatches if args.all else 1
+        _, total_sent = run_pipeline(api, lands, heroes, confirm=args.confirm, limit=limit, journal=journal)
+        if args.confirm:
+            print(f"[CONFIRM] Finished. Total successful dispatches: {total_sent}")
+        else:
+            print("[DRY-RUN] Finished. No dispatch executed.")
+        return
+
+    if args.horizon_cycles > 0:
+        from horizon import build_horizon_plan
+
+        plan = build_horizon_plan(api, lands, heroes, cycles=args.horizon_cycles)
+    else:
+        plan = build_plan(api, lands, heroes)
     log_plan(plan)
 
     if not args.confirm:
@@ -50,18 +96,30 @@ def main():
         return
 
     total_sent = 0
+    limit = args.max_dispatches if args.all else 1
     to_run = [c for c in plan.choices if c.chosen_heroes]
-    if not args.all:
-        to_run = to_run[:1]
-
-    for choice in to_run:
-        ok = run_dispatch_single(api, choice, max_retries=3, delay=5)
-        if not ok:
-            print("[HALT] Stopping due to failed dispatch after retries.")
-            return
-        total_sent += 1
-        if total_sent >= args.max_dispatches:
-            break
+
+    journal = DispatchJournal(args.journal)
+
+    done = []
+    while to_run and (limit is None or total_sent < limit):
+        choice = to_run.pop(0)
+        # PLANNED only right before sending: anything the run never got to stays out of the journal
+        journal.record_planned([choice])
+        outcome = dispatch_choice(api, choice, max_retries=3, delay=5, journal=journal)
+        done.append(choice)
+        if outcome == OUTCOME_SENT:
+            total_sent += 1
+            continue
+
+        # Failed or skipped as busy: its heroes are free again, patch the plan instead of stopping
+        if outcome == OUTCOME_FAILED:
+            print("[REPAIR] Dispatch failed after retries; reassigning its heroes.")
+        plan = repair_plan(
+            plan, choice, choice.chosen_heroes, lands, heroes,
+            pending=to_run, dispatch_failed=(outcome == OUTCOME_FAILED),
+        )
+        to_run = [c for c in plan.choices if c.chosen_heroes and c not in done]
 
     print(f"[CONFIRM] Finished. Total successful dispatches: {total_sent}")
 
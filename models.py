@@ -61,4 +61,18 @@ class DispatchChoice:
 
 @dataclass
 class Plan:
-    choices: List[DispatchChoice]
\ No newline at end of file
+    choices: List[DispatchChoice]
+
+@dataclass
+class HireCandidate:
+    name: str
+    heroes: List[Hero]  # hypothetical heroes (e.g. a mercenary hire)
+    cost: float = 0.0
+
+@dataclass
+class HireResult:
+    name: str
+    cost: float
+    points_gained: float
+    points_per_cost: float
+    dispatches_gained: int
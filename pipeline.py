@@ -0,0 +1,150 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import replace
+from typing import List, Optional, Tuple
+
+from models import LandZ, Building, BuffMission, Hero, Plan, DispatchChoice
+from config import GRADE_POINTS
+from planner import FAILED_REASON, _collect_candidates, _plan_candidates, _consume_pool, repair_plan
+from rules import hero_matches
+from selector import evaluate_mission_with_available
+from dispatcher import dispatch_choice, OUTCOME_SENT, OUTCOME_FAILED
+from journal import DispatchJournal
+from logger import log_plan
+
+TOP_GRADE = max(GRADE_POINTS)
+
+
+def _safe_to_commit(choice: DispatchChoice, seen: List[Tuple[int, BuffMission]]) -> bool:
+    """Ordering rule for lands that are still loading: a building may go out early only
+    if none of its heroes could be the key of a higher-grade building, nor match a
+    mission of a higher-grade building already seen (`seen`: (grade, mission) pairs).
+    Buildings of lands not loaded yet are unknown, so this limits the loss, not removes it."""
+    if choice.grade < TOP_GRADE and any(hero.grade > choice.grade for hero in choice.chosen_heroes):
+        return False
+    return not any(
+        hero_matches(hero, mission)
+        for grade, mission in seen if grade > choice.grade
+        for hero in choice.chosen_heroes
+    )
+
+
+class _Dispatcher:
+    """Sends committed choices (confirm mode) and tracks the hero pool."""
+
+    def __init__(self, api, confirm: bool, limit: int, journal: Optional[DispatchJournal]):
+        self.api = api
+        self.confirm = confirm
+        self.limit = limit
+        self.journal = journal
+        self.sent = 0
+
+    @property
+    def full(self) -> bool:
+        return self.confirm and self.limit is not None and self.sent >= self.limit
+
+    def send(self, choice: DispatchChoice) -> str:
+        """Outcome of the dispatch; in dry-run every choice counts as sent (heroes locked)."""
+        if not self.confirm:
+            return OUTCOME_SENT
+        if self.journal is not None:
+            self.journal.record_planned([choice])
+        outcome = dispatch_choice(self.api, choice, max_retries=3, delay=5, journal=self.journal)
+        if outcome == OUTCOME_SENT:
+            self.sent += 1
+        return outcome
+
+
+def run_pipeline(
+    api,
+    lands: List[LandZ],
+    hero_pool: List[Hero],
+    confirm: bool = False,
+    limit: Optional[int] = 1,
+    journal: Optional[DispatchJournal] = None,
+    fetch_workers: int = 4,
+) -> Tuple[Plan, int]:
+    """Streaming fetch → plan → dispatch.
+
+    Buildings are fetched for all lands concurrently. As each land arrives its
+    buildings are evaluated (grade desc) against the remaining pool; choices that
+    pass _safe_to_commit are dispatched right away, the rest are deferred. Once every
+    land is loaded the deferred buildings are planned with the regular greedy pass
+    and dispatched like the batch flow, repairing the plan when one fails or is skipped.
+
+    Early commits only happen when `limit` is None (no cap): with a cap the budget
+    must go to the best choices across all lands, which are only known once every
+    land is loaded, so the run behaves like the batch flow. Even uncapped, an early
+    commit can take heroes a building of a land still loading would have used, so
+    the plan may score a little below build_plan: latency is traded for points.
+    A land that fails to load (after the API's read retries) fails the run.
+    Returns the full plan and the number of dispatches sent.
+    """
+    sender = _Dispatcher(api, confirm, limit, journal)
+    early = limit is None
+    seen: List[Tuple[int, BuffMission]] = []
+    pool = hero_pool[:]
+    committed: List[DispatchChoice] = []
+    failed: List[DispatchChoice] = []
+    deferred: List[Tuple[LandZ, Building]] = []
+
+    with ThreadPoolExecutor(max_workers=fetch_workers) as executor:
+        futures = {executor.submit(api.get_buildings, land.tokenId): land for land in lands}
+        for future in as_completed(futures):
+            land = futures[future]
+            try:
+                land.buildings = future.result()
+            except Exception as exc:
+                # Same as the batch flow: no plan from a partial view of the account
+                print(f"[STREAM] ❌ Failed to load land={land.tokenId}: {exc}")
+                raise
+            print(f"[STREAM] Land loaded → #{land.tokenId} ({len(land.buildings)} building(s))")
+            candidates = _collect_candidates([land])
+            seen.extend((building.grade, mission) for _, building in candidates for mission in building.buffMissions)
+            for _, building in candidates:
+                if not early or sender.full:
+                    deferred.append((land, building))
+                    continue
+                choice = evaluate_mission_with_available(pool, building, land.tokenId, land.name)
+                if not choice.chosen_heroes or not _safe_to_commit(choice, seen):
+                    deferred.append((land, building))
+                    continue
+                outcome = sender.send(choice)
+                if outcome == OUTCOME_SENT:
+                    print(f"[STREAM] Committed early → land={land.tokenId} name={building.name}")
+                    committed.append(choice)
+                    pool = _consume_pool(pool, choice.chosen_heroes)
+                elif outcome == OUTCOME_FAILED:
+                    # Same as repair_plan: a failed building is kept as a reservation, not retried
+                    failed.append(replace(choice, chosen_heroes=[], reserved_heroes=[], reason=FAILED_REASON))
+                # Skipped as busy on server: drop the building
+
+    deferred.sort(key=lambda lb: (lb[1].grade, lb[1].name), reverse=True)
+    rest, _ = _plan_candidates(deferred, pool)
+    if confirm:
+        rest = _dispatch_rest(sender, rest, lands, pool)
+
+    committed.sort(key=lambda c: (c.grade, c.estimated_total_points), reverse=True)
+    plan = Plan(choices=committed + rest.choices + failed)
+    log_plan(plan)
+    return plan, sender.sent
+
+
+def _dispatch_rest(sender: _Dispatcher, plan: Plan, lands: List[LandZ], hero_pool: List[Hero]) -> Plan:
+    """Dispatch the deferred plan in order; a failed or skipped choice frees its heroes
+    and the plan is repaired in memory, as in the batch flow."""
+    to_run = [c for c in plan.choices if c.chosen_heroes]
+    done: List[DispatchChoice] = []
+    while to_run and not sender.full:
+        choice = to_run.pop(0)
+        outcome = sender.send(choice)
+        done.append(choice)
+        if outcome == OUTCOME_SENT:
+            continue
+        if outcome == OUTCOME_FAILED:
+            print("[REPAIR] Dispatch failed after retries; reassigning its heroes.")
+        plan = repair_plan(
+            plan, choice, choice.chosen_heroes, lands, hero_pool,
+            pending=to_run, dispatch_failed=(outcome == OUTCOME_FAILED),
+        )
+        to_run = [c for c in plan.choices if c.chosen_heroes and c not in done]
+    return plan
@@ -1,7 +1,11 @@
-from typing import List, Tuple
+from dataclasses import replace
+from typing import List, Tuple, Optional
 from models import LandZ, Plan, DispatchChoice, Building, Hero
 from selector import evaluate_mission_with_available
 
+FAILED_REASON = "Dispatch failed after retries; heroes reassigned."
+HELD_REASON = "Held back: horizon planner expects more points/day keeping these heroes for a later cycle."
+
 
 def _consume_pool(available_heroes: List[Hero], chosen_for_building: List[Hero]) -> List[Hero]:
     """Return a new pool with heroes used for a building removed."""
@@ -14,22 +18,24 @@ def _is_building_in_progress(building: Building) -> bool:
     return bool(building.pendingReward or building.herozList)
 
 
-def build_plan(api, lands: List[LandZ], hero_pool: List[Hero]) -> Plan:
-    """Create an ordered plan of dispatch choices across all lands/buildings."""
-    dispatchable: List[Tuple[int, DispatchChoice]] = []
-    reservations: List[DispatchChoice] = []
+def _collect_candidates(lands: List[LandZ], verbose: bool = True) -> List[Tuple[LandZ, Building]]:
+    """Buildings that are not busy, sorted by grade (desc) then name for stability."""
     candidates: List[Tuple[LandZ, Building]] = []
-
-    # Collect all candidate buildings that are not busy
     for land in lands:
         for building in land.buildings:
             if _is_building_in_progress(building):
-                print(f"[FILTER] Skip in-progress: land={land.tokenId} name={building.name}")
+                if verbose:
+                    print(f"[FILTER] Skip in-progress: land={land.tokenId} name={building.name}")
                 continue
             candidates.append((land, building))
-
-    # Sort by building grade (desc) then by name for stability
     candidates.sort(key=lambda lb: (lb[1].grade, lb[1].name), reverse=True)
+    return candidates
+
+
+def _plan_candidates(candidates: List[Tuple[LandZ, Building]], hero_pool: List[Hero]) -> Tuple[Plan, List[Hero]]:
+    """Greedy pass over already sorted candidates. Returns the plan and the heroes left unused."""
+    dispatchable: List[Tuple[int, DispatchChoice]] = []
+    reservations: List[DispatchChoice] = []
 
     working_pool = hero_pool[:]
     for land, building in candidates:
@@ -40,11 +46,99 @@ def build_plan(api, lands: List[LandZ], hero_pool: List[Hero]) -> Plan:
         else:
             reservations.append(choice)
 
-    # Order dispatchable choices by (grade desc, estimated_total_points desc)
-    dispatchable.sort(key=lambda item: (item[0], item[1].estimated_total_points), reverse=True)
-    ordered = [choice for _, choice in dispatchable]
+    return _ordered_plan([choice for _, choice in dispatchable] + reservations), working_pool
+
 
-    # Order reservations by (grade desc, base_points desc)
+def _ordered_plan(choices: List[DispatchChoice]) -> Plan:
+    """build_plan's ordering: dispatchable choices by (grade desc, estimated_total_points desc),
+    then reservations by (grade desc, base_points desc)."""
+    dispatchable = [c for c in choices if c.chosen_heroes]
+    reservations = [c for c in choices if not c.chosen_heroes]
+    dispatchable.sort(key=lambda c: (c.grade, c.estimated_total_points), reverse=True)
     reservations.sort(key=lambda c: (c.grade, c.base_points), reverse=True)
+    return Plan(choices=dispatchable + reservations)
+
+
+def build_plan(api, lands: List[LandZ], hero_pool: List[Hero]) -> Plan:
+    """Create an ordered plan of dispatch choices across all lands/buildings."""
+    plan, _ = _plan_candidates(_collect_candidates(lands), hero_pool)
+    return plan
+
+
+def _find_building(lands: List[LandZ], land_id: int, building_type: int) -> Optional[Tuple[LandZ, Building]]:
+    for land in lands:
+        if land.tokenId != land_id:
+            continue
+        for building in land.buildings:
+            if building.buildingType == building_type:
+                return land, building
+    return None
+
+
+def repair_plan(
+    plan: Plan,
+    failed: DispatchChoice,
+    freed_heroes: List[Hero],
+    lands: List[LandZ],
+    hero_pool: List[Hero],
+    pending: Optional[List[DispatchChoice]] = None,
+    dispatch_failed: bool = True,
+) -> Plan:
+    """Patch `plan` after `failed` was not dispatched (error or building already busy).
+
+    Works on the state already in memory, no API calls:
+      1) reservation-only choices (grade desc) are re-evaluated with the freed heroes
+         plus the heroes no choice is using, and promoted when they get a key;
+      2) with what is left, `pending` choices (not dispatched yet) are upgraded when
+         their own heroes + leftovers complete more buffs.
+    A failed building stays in the plan as a reservation; a busy one is dropped.
+    Held-back choices (HELD_REASON) and their heroes are left alone.
+    """
+    others = [c for c in plan.choices if c is not failed]
+    in_use = {h.tokenId for c in others for h in c.chosen_heroes}
+    # Heroes the horizon planner is holding back are not spare either
+    in_use.update(h.tokenId for c in others if c.reason == HELD_REASON for h in c.reserved_heroes)
+    freed_ids = {h.tokenId for h in freed_heroes}
+    spare = [h for h in hero_pool if h.tokenId not in in_use and h.tokenId not in freed_ids]
+    pool = freed_heroes[:] + spare
+
+    repaired: List[DispatchChoice] = []
+    for choice in others:
+        # Failed buildings are not retried, and held-back ones stay held (horizon planner's decision)
+        if choice.chosen_heroes or not pool or choice.reason in (FAILED_REASON, HELD_REASON):
+            repaired.append(choice)
+            continue
+        found = _find_building(lands, choice.landId, choice.buildingType)
+        if found is None:
+            repaired.append(choice)
+            continue
+        land, building = found
+        new_choice = evaluate_mission_with_available(pool, building, land.tokenId, land.name)
+        if new_choice.chosen_heroes:
+            print(f"[REPAIR] Promoted reservation → land={land.tokenId} name={building.name}")
+            pool = _consume_pool(pool, new_choice.chosen_heroes)
+        repaired.append(new_choice)
+
+    pending_ids = {id(c) for c in (pending or [])}
+    for index, choice in enumerate(repaired):
+        if id(choice) not in pending_ids or not pool:
+            continue
+        found = _find_building(lands, choice.landId, choice.buildingType)
+        if found is None:
+            continue
+        land, building = found
+        upgraded = evaluate_mission_with_available(pool + choice.chosen_heroes, building, land.tokenId, land.name)
+        if upgraded.chosen_heroes and upgraded.estimated_total_points > choice.estimated_total_points:
+            print(f"[REPAIR] Upgraded pending → land={land.tokenId} name={building.name}")
+            pool = _consume_pool(pool + choice.chosen_heroes, upgraded.chosen_heroes)
+            repaired[index] = upgraded
+
+    if dispatch_failed:
+        repaired.append(replace(
+            failed,
+            chosen_heroes=[],
+            reserved_heroes=[],
+            reason=FAILED_REASON,
+        ))
 
-    return Plan(choices=ordered + reservations)
\ No newline at end of file
+    return _ordered_plan(repaired)
@@ -1,4 +1,5 @@
-from typing import List, Tuple, Optional
+from contextlib import contextmanager
+from typing import Dict, List, Tuple, Optional
 
 from models import Hero, Building, DispatchChoice
 from config import BUILDING_HERO_COUNT, GRADE_POINTS, GRADE_BUFF_PERCENT, GRADE_MAP
@@ -10,6 +11,29 @@ from rules import hero_matches, find_all_keys, choose_fillers, pop_by_ids
 # -----------------------------
 _PRIMAL_PREF = {1: 0, 2: 1, 0: 2}  # Base < Elite < Genesis (mantido)
 
+# Candidatos de missão mantidos por missão no pool enxuto.
+# whatif depende deste valor para saber quando um herói novo entra no pool.
+MISSION_CANDIDATE_CAP = 8
+
+# Contadores para benchmark (bench.py zera e lê)
+SEARCH_STATS = {"nodes": 0}
+
+# Memo opcional da busca, ligado com search_memo() por quem avalia os mesmos prédios
+# muitas vezes (whatif). Chave: (missões, key, candidatos, max_extra) -> extras
+_SEARCH_MEMO: Optional[Dict[Tuple, Optional[List[Hero]]]] = None
+
+
+@contextmanager
+def search_memo(memo: Dict[Tuple, Optional[List[Hero]]]):
+    """Reaproveita resultados de _backtrack_complete_with_key dentro do bloco.
+    O resultado só depende das missões, do key e dos candidatos, então é exato."""
+    global _SEARCH_MEMO
+    previous, _SEARCH_MEMO = _SEARCH_MEMO, memo
+    try:
+        yield memo
+    finally:
+        _SEARCH_MEMO = previous
+
 
 def _hero_cost_key(h: Hero) -> Tuple[int, int, int, int]:
     """Menor custo: menor grade, Base antes de Elite/Genesis, menor star e tokenId."""
@@ -54,7 +78,7 @@ def _finalize_assignments(final_selected: List[Hero], building: Building) -> Tup
 # Núcleo: busca pequena e determinística
 # -----------------------------
 
-def _build_candidate_pool(available: List[Hero], building: Building, cap_per_mission: int = 8) -> List[Hero]:
+def _build_candidate_pool(available: List[Hero], building: Building, cap_per_mission: int = MISSION_CANDIDATE_CAP) -> List[Hero]:
     """Une candidatos relevantes às missões + keys + fillers baratos.
     Mantém o conjunto pequeno para permitir backtracking leve.
     """
@@ -80,9 +104,11 @@ def _build_candidate_pool(available: List[Hero], building: Building, cap_per_mis
     pool_dedup = list(uniq.values())
 
     # Ordena priorizando: keys que ajudam missões > demais candidatos de missão > outros keys > fillers
+    key_ids = {k.tokenId for k in keys}
+
     def priority(h: Hero) -> Tuple[int, Tuple[int, int, int, int]]:
         h_matches_any = any(hero_matches(h, m) for m in building.buffMissions)
-        is_key = h in keys
+        is_key = h.tokenId in key_ids
         # menor é melhor; valores negativos dão prioridade
         if is_key and h_matches_any:
             p = 0
@@ -114,6 +140,13 @@ def _backtrack_complete_with_key(
     """Tenta completar TODAS as missões usando o key + até max_extra heróis.
     Permite sobreposição (um herói pode contar para múltiplas missões).
     Retorna somente os extras (sem o key)."""
+    memo_key = None
+    if _SEARCH_MEMO is not None:
+        # id(missions): a lista de missões da building vive enquanto o memo vive
+        memo_key = (id(missions), key_hero.tokenId, tuple(h.tokenId for h in candidates), max_extra)
+        if memo_key in _SEARCH_MEMO:
+            return _SEARCH_MEMO[memo_key]
+
     needs = [m.boostConditionCount for m in missions]
     # Aplica o key
     needs = _needs_after_take(needs, key_hero, missions)
@@ -142,6 +175,7 @@ def _backtrack_complete_with_key(
 
     def bt(idx: int, needs_left: List[int]):
         nonlocal best, chosen
+        SEARCH_STATS["nodes"] += 1
         if all(n <= 0 for n in needs_left):
             # solução encontrada; escolhe a mais barata/menor
             cand = chosen[:]
@@ -169,6 +203,8 @@ def _backtrack_complete_with_key(
         bt(idx + 1, needs_left)
 
     bt(0, needs)
+    if memo_key is not None:
+        _SEARCH_MEMO[memo_key] = best
     return best
 
 
@@ -176,10 +212,13 @@ def _try_both_missions(
     key_hero: Hero,
     pool: List[Hero],
     missions,
+    helpers: Optional[List[Hero]] = None,
 ) -> Optional[List[Hero]]:
     # Considera apenas candidatos que ajudam pelo menos 1 missão (mantém busca enxuta)
-    mission_helpers = [h for h in pool if any(hero_matches(h, m) for m in missions) and h.tokenId != key_hero.tokenId]
-    mission_helpers = sorted(mission_helpers, key=_hero_cost_key)[:16]
+    # `helpers`: os mesmos candidatos já ordenados por custo, calculados uma vez por building
+    if helpers is None:
+        helpers = sorted([h for h in pool if any(hero_matches(h, m) for m in missions)], key=_hero_cost_key)
+    mission_helpers = [h for h in helpers if h.tokenId != key_hero.tokenId][:16]
 
     extras = _backtrack_complete_with_key(key_hero, mission_helpers, missions, max_extra=3)
     if extras is None:
@@ -222,6 +261,14 @@ def _try_single_mission(
     return None
 
 
+def _selection_inputs(available_heroes: List[Hero], building: Building) -> Tuple[int, ...]:
+    """Ids de tudo que evaluate_mission_with_available lê do pool.
+    Mesma assinatura => mesma escolha (PlanningSession e whatif reaproveitam escolhas com isso)."""
+    if not find_all_keys(available_heroes, building.grade):
+        return (-1,) + tuple(h.tokenId for h in choose_fillers(available_heroes, BUILDING_HERO_COUNT))
+    return tuple(h.tokenId for h in _build_candidate_pool(available_heroes, building))
+
+
 # -----------------------------
 # Função pública
 # -----------------------------
@@ -272,14 +319,19 @@ def evaluate_mission_with_available(
 
     # Tenta primeiro com keys que ajudam alguma missão
     preferred_keys = [k for k in key_heroes if any(hero_matches(k, m) for m in building.buffMissions)]
-    other_keys = [k for k in key_heroes if k not in preferred_keys]
+    preferred_ids = {k.tokenId for k in preferred_keys}
+    other_keys = [k for k in key_heroes if k.tokenId not in preferred_ids]
     try_keys = sorted(preferred_keys, key=_hero_cost_key) + sorted(other_keys, key=_hero_cost_key)
 
     final_selection: Optional[List[Hero]] = None
 
-    # 3) Tentar completar DUAS missões
+    # 3) Tentar completar DUAS missões (candidatos de missão calculados uma vez para todos os keys)
+    helpers = sorted(
+        [h for h in cand_pool if any(hero_matches(h, m) for m in building.buffMissions)],
+        key=_hero_cost_key,
+    )
     for key_h in try_keys:
-        both = _try_both_missions(key_h, cand_pool, building.buffMissions)
+        both = _try_both_missions(key_h, cand_pool, building.buffMissions, helpers)
         if both is not None:
             final_selection = both
             break
@@ -0,0 +1,131 @@
+from typing import Dict, List, Optional, Tuple
+
+from models import Hero, LandZ, Plan, DispatchChoice
+from planner import _collect_candidates, _consume_pool, _ordered_plan
+from selector import evaluate_mission_with_available, _selection_inputs
+
+# (landId, buildingType) -> (choice, selector inputs it was computed from)
+Memo = Dict[Tuple[int, int], Tuple[DispatchChoice, Tuple[int, ...]]]
+
+
+class PlanningSession:
+    """Keeps the Api, the fetched state and the selector results warm between plans.
+
+    Meant for the notebook and scripts that plan repeatedly:
+
+        session = PlanningSession(token, region=2)
+        plan = session.plan()            # first call fetches everything
+        session.dispatch(plan.choices[0])
+        plan = session.plan()            # no requests; unchanged buildings are reused
+
+    Local changes (dispatch, claim) update the in-memory state instead of refetching
+    the whole world, and each building's last choice is reused when its selector
+    inputs did not change, so re-planning costs milliseconds. Refetching a land or
+    the heroes drops the memoized choices that depend on them.
+    """
+
+    def __init__(self, token: Optional[str] = None, region: int = 1, api=None):
+        if api is None:
+            from api import Api  # deferred: pulls in requests
+
+            api = Api(token, region=region)
+        self.api = api
+        self.heroes: List[Hero] = []
+        self.lands: List[LandZ] = []
+        self._loaded = False
+        self._memo: Memo = {}
+
+    # -----------------------------
+    # State
+    # -----------------------------
+
+    def refresh(self):
+        """Full fetch: heroes, lands and every land's buildings."""
+        self.heroes = self.api.get_heroes()
+        self.lands = self.api.get_lands()
+        for land in self.lands:
+            land.buildings = self.api.get_buildings(land.tokenId)
+        self._loaded = True
+        self._memo = {}
+
+    def refresh_land(self, land_id: int):
+        """Refetch a single land's buildings."""
+        for land in self.lands:
+            if land.tokenId == land_id:
+                land.buildings = self.api.get_buildings(land_id)
+                self._forget_land(land_id)
+                return
+        print(f"[SESSION] ⚠️ Unknown land={land_id}; call refresh() to reload lands.")
+
+    def _forget_land(self, land_id: int):
+        """Drop memoized choices of a land whose buildings were refetched: the memo is
+        keyed by hero ids only, so a changed grade or mission would otherwise be missed."""
+        self._memo = {key: value for key, value in self._memo.items() if key[0] != land_id}
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.refresh()
+
+    # -----------------------------
+    # Planning
+    # -----------------------------
+
+    def plan(self, verbose: bool = False) -> Plan:
+        """Same plan as planner.build_plan on the current in-memory state.
+
+        Same greedy pass, but a building's last choice is reused when the selector
+        inputs (the exact hero ids it reads from the pool) did not change."""
+        self._ensure_loaded()
+        memo: Memo = {}
+        choices: List[DispatchChoice] = []
+        working_pool = self.heroes[:]
+        for land, building in _collect_candidates(self.lands, verbose=verbose):
+            key = (land.tokenId, building.buildingType)
+            inputs = _selection_inputs(working_pool, building)
+            cached = self._memo.get(key)
+            if cached is not None and cached[1] == inputs:
+                choice = cached[0]
+            else:
+                choice = evaluate_mission_with_available(working_pool, building, land.tokenId, land.name)
+            memo[key] = (choice, inputs)
+            choices.append(choice)
+            if choice.chosen_heroes:
+                working_pool = _consume_pool(working_pool, choice.chosen_heroes)
+        self._memo = memo
+        return _ordered_plan(choices)
+
+    # -----------------------------
+    # Actions
+    # -----------------------------
+
+    def dispatch(self, choice: DispatchChoice, max_retries: int = 3, delay: int = 5, journal=None) -> str:
+        """Dispatch and, when sent, lock the heroes and the building locally (no refetch)."""
+        from dispatcher import dispatch_choice, OUTCOME_SENT, OUTCOME_SKIPPED
+
+        outcome = dispatch_choice(self.api, choice, max_retries=max_retries, delay=delay, journal=journal)
+        if outcome == OUTCOME_SENT:
+            used = {h.tokenId for h in choice.chosen_heroes}
+            self.heroes = [h for h in self.heroes if h.tokenId not in used]
+            self._mark_busy(choice)
+        elif outcome == OUTCOME_SKIPPED:
+            # Server says busy: our state is stale for this land
+            self.refresh_land(choice.landId)
+        return outcome
+
+    def claim(self, land_id: int) -> dict:
+        """Claim a land; on success refetch that land and the heroes it released."""
+        res = self.api.claim(land_id)
+        if res.get("header", {}).get("status", 0) == 200:
+            self.refresh_land(land_id)
+            self.heroes = self.api.get_heroes()
+            # Same ids may come back with new attributes (grade, star): nothing memoized holds
+            self._memo = {}
+        return res
+
+    def _mark_busy(self, choice: DispatchChoice):
+        for land in self.lands:
+            if land.tokenId != choice.landId:
+                continue
+            for building in land.buildings:
+                if building.buildingType == choice.buildingType:
+                    building.herozList = list(choice.chosen_heroes)
@@ -0,0 +1,211 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+from models import Hero, LandZ, Building, BuffMission, HireCandidate, HireResult
+from config import BUILDING_HERO_COUNT
+from planner import _collect_candidates, _consume_pool
+from rules import hero_matches, choose_fillers, find_all_keys
+from selector import MISSION_CANDIDATE_CAP, evaluate_mission_with_available, search_memo, _selection_inputs, _build_candidate_pool, _match_candidates, _hero_cost_key
+
+CostKey = Tuple[int, int, int, int]
+
+
+class _Step:
+    """One building of the baseline greedy pass, with what it takes to change its choice."""
+
+    def __init__(self, land: LandZ, building: Building, pool: List[Hero]):
+        self.land = land
+        self.building = building
+        self.pool = pool  # baseline working pool before this building
+        self.choice = evaluate_mission_with_available(pool, building, land.tokenId, land.name)
+        self.inputs = set(_selection_inputs(pool, building))
+        self.chosen_ids = {h.tokenId for h in self.choice.chosen_heroes}
+        # A new hero enters the candidate pool only if it beats the last of a capped list
+        # (None: the list is not full, any match gets in)
+        self.mission_limits: List[Tuple[BuffMission, Optional[CostKey]]] = []
+        for mission in building.buffMissions:
+            matches = _match_candidates(pool, mission)
+            limit = _hero_cost_key(matches[MISSION_CANDIDATE_CAP - 1]) if len(matches) >= MISSION_CANDIDATE_CAP else None
+            self.mission_limits.append((mission, limit))
+        fillers = choose_fillers(pool, BUILDING_HERO_COUNT)
+        self.filler_limit = _hero_cost_key(fillers[-1]) if len(fillers) >= BUILDING_HERO_COUNT else None
+
+        # Keys that help no mission are interchangeable for the search: a new one only
+        # matters if it is tried first (cheaper than the cheapest such key) or can end up
+        # as a filler (cheaper than the first 2 teams' worth of the candidate pool)
+        self.plain_key_limit: Optional[CostKey] = None
+        self.pool_limit: Optional[CostKey] = None
+        plain_keys = [k for k in find_all_keys(pool, building.grade) if not self._helps(k)]
+        if plain_keys:
+            self.plain_key_limit = _hero_cost_key(plain_keys[0])
+            cand_pool = sorted(_build_candidate_pool(pool, building), key=_hero_cost_key)
+            if len(cand_pool) >= 2 * BUILDING_HERO_COUNT:
+                self.pool_limit = _hero_cost_key(cand_pool[2 * BUILDING_HERO_COUNT - 1])
+        # Losing a hero only matters if it was chosen or could help a mission
+        self.sensitive = self.chosen_ids | {h.tokenId for h in pool if h.tokenId in self.inputs and self._helps(h)}
+
+    def _helps(self, hero: Hero) -> bool:
+        return any(hero_matches(hero, mission) for mission in self.building.buffMissions)
+
+    def affected(self, added: Dict[int, Hero], removed: Set[int]) -> bool:
+        """Whether the choice can differ from the baseline's when `added` heroes are in
+        the pool and `removed` ones are not. False means the choice is reused as-is."""
+        if not removed.isdisjoint(self.sensitive):
+            return True
+        for hero in added.values():
+            cost = _hero_cost_key(hero)
+            if hero.grade >= self.building.grade:
+                if self._helps(hero) or self.plain_key_limit is None or self.pool_limit is None:
+                    return True
+                if cost < self.plain_key_limit or cost < self.pool_limit:
+                    return True
+                continue
+            if self.filler_limit is None or cost < self.filler_limit:
+                return True
+            for mission, limit in self.mission_limits:
+                if hero_matches(hero, mission) and (limit is None or cost < limit):
+                    return True
+        return False
+
+
+class _Baseline:
+    """Shared precomputation: the baseline greedy pass, step by step."""
+
+    def __init__(self, lands: List[LandZ], hero_pool: List[Hero]):
+        self.steps: List[_Step] = []
+        # Searches recorded here are replayed by scenarios that only change fillers
+        self.memo: Dict[Tuple, Optional[List[Hero]]] = {}
+        working_pool = hero_pool[:]
+        with search_memo(self.memo):
+            for land, building in _collect_candidates(lands, verbose=False):
+                step = _Step(land, building, working_pool)
+                self.steps.append(step)
+                if step.choice.chosen_heroes:
+                    working_pool = _consume_pool(working_pool, step.choice.chosen_heroes)
+        self.points = sum(step.choice.estimated_total_points for step in self.steps if step.choice.chosen_heroes)
+        self.dispatches = sum(1 for step in self.steps if step.choice.chosen_heroes)
+
+    def evaluate(self, extra_heroes: List[Hero]) -> Tuple[float, int]:
+        """Points and dispatch count with `extra_heroes` added to the pool.
+
+        Same result as a full greedy pass on the bigger pool, but only buildings whose
+        candidate pool can see the difference (heroes added or no longer free compared
+        with the baseline at that point) run the selector; the rest reuse their choice.
+        Selector searches are memoized across scenarios.
+        """
+        with search_memo(self.memo):
+            return self._evaluate(extra_heroes)
+
+    def _evaluate(self, extra_heroes: List[Hero]) -> Tuple[float, int]:
+        added: Dict[int, Hero] = {h.tokenId: h for h in extra_heroes}
+        removed: Set[int] = set()
+        points = 0.0
+        dispatches = 0
+        for step in self.steps:
+            if not step.affected(added, removed):
+                choice = step.choice
+            else:
+                pool = [h for h in step.pool if h.tokenId not in removed] + list(added.values())
+                choice = evaluate_mission_with_available(pool, step.building, step.land.tokenId, step.land.name)
+                chosen_ids = {h.tokenId for h in choice.chosen_heroes}
+                # Baseline took step.chosen_ids, this scenario took chosen_ids: update the difference
+                for token_id in step.chosen_ids - chosen_ids - removed:
+                    added[token_id] = next(h for h in step.pool if h.tokenId == token_id)
+                removed = (removed - step.chosen_ids) | (chosen_ids - step.chosen_ids - set(added))
+                for token_id in chosen_ids:
+                    added.pop(token_id, None)
+            if choice.chosen_heroes:
+                points += choice.estimated_total_points
+                dispatches += 1
+        return points, dispatches
+
+
+_shared: Optional[_Baseline] = None  # per worker process, set by _init_worker
+
+
+def _init_worker(baseline: _Baseline):
+    global _shared
+    # Memo keys hold object ids from the parent process: start a fresh one here
+    baseline.memo = {}
+    _shared = baseline
+
+
+def _evaluate_candidate(candidate: HireCandidate) -> Tuple[float, int]:
+    return _shared.evaluate(candidate.heroes)
+
+
+def rank_hires(
+    lands: List[LandZ],
+    hero_pool: List[Hero],
+    candidates: List[HireCandidate],
+    workers: int = 1,
+) -> List[HireResult]:
+    """Marginal estimated_total_points of each hypothetical hire, ranked by points per cost.
+
+    The baseline plan and each building's entry thresholds are computed once and
+    shared; a scenario re-runs the selector only on buildings whose candidate pool
+    its heroes can change. Scenarios run in a process pool when workers > 1.
+    """
+    baseline = _Baseline(lands, hero_pool)
+    if workers > 1 and len(candidates) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(baseline,)) as executor:
+            outcomes = list(executor.map(_evaluate_candidate, candidates))
+    else:
+        outcomes = [baseline.evaluate(c.heroes) for c in candidates]
+
+    results: List[HireResult] = []
+    for candidate, (points, dispatches) in zip(candidates, outcomes):
+        gained = points - baseline.points
+        per_cost = gained / candidate.cost if candidate.cost > 0 else float("inf") if gained > 0 else 0.0
+        results.append(HireResult(
+            name=candidate.name,
+            cost=candidate.cost,
+            points_gained=gained,
+            points_per_cost=per_cost,
+            dispatches_gained=dispatches - baseline.dispatches,
+        ))
+    results.sort(key=lambda r: (r.points_per_cost, r.points_gained), reverse=True)
+    return results
+
+
+def load_candidates(path: str) -> List[HireCandidate]:
+    """Read hire candidates from JSON:
+    [{"name": "...", "cost": 10, "heroes": [{"grade": 3, "race": 2, "star": 1, "primalType": 1}]}]
+    Heroes without tokenId get negative ids so they never clash with real ones.
+    """
+    with open(path, "r", encoding="utf-8") as fh:
+        data = json.load(fh)
+    next_id = -1
+    candidates: List[HireCandidate] = []
+    for entry in data:
+        heroes: List[Hero] = []
+        for hero_data in entry.get("heroes", []):
+            token_id = hero_data.get("tokenId")
+            if token_id is None:
+                token_id, next_id = next_id, next_id - 1
+            primal = int(hero_data.get("primalType", 1))
+            heroes.append(Hero(
+                tokenId=int(token_id),
+                grade=int(hero_data.get("grade", 0)),
+                name=hero_data.get("name", entry.get("name", "")),
+                race=int(hero_data.get("race", -1)),
+                star=int(hero_data.get("star", 0)),
+                primalType=primal,
+                createType=primal,
+            ))
+        candidates.append(HireCandidate(name=entry.get("name", f"hire-{len(candidates) + 1}"), heroes=heroes, cost=float(entry.get("cost", 0))))
+    return candidates
+
+
+def log_hires(results: List[HireResult]):
+    print("=== Hire Ranking (what-if) ===")
+    if not results:
+        print("(no candidates)")
+        return
+    for index, r in enumerate(results, 1):
+        per_cost = "∞" if r.points_per_cost == float("inf") else f"{r.points_per_cost:.2f}"
+        print(
+            f"{index:02d}. {r.name} | Cost={r.cost:g} | +Points={r.points_gained:.1f} | "
+            f"+Dispatches={r.dispatches_gained} | Points/Cost={per_cost}"
+        )